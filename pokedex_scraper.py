@@ -4,135 +4,477 @@ Pokemon Bulbapedia Scraper
 Fetches Pokemon data from Bulbapedia and formats it according to specifications.
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+from collections import defaultdict
+from functools import lru_cache
+import httpx
+import logging
+from lxml import etree, html
+import orjson
+import re
+import shelve
 import sys
 import time
+from urllib.parse import unquote
 
 
-def fetch_pokemon_data(pokemon_name):
+logger = logging.getLogger(__name__)
+
+# Every fetch goes through one AsyncClient, so requests are multiplexed over a
+# single keep-alive HTTP/2 connection to Bulbapedia instead of paying a fresh
+# TCP+TLS handshake per Pokemon. httpx advertises brotli ("br") on top of
+# gzip/deflate whenever the brotli package is installed
+HEADERS = {
+    'User-Agent': 'pokedex-scraper/1.0 (+https://github.com/citronlegacy/unsorted-scrapers)',
+}
+
+# Number of pages fetched concurrently, and the sustained request rate (with
+# short bursts allowed) per host so we stay polite to Bulbapedia
+MAX_CONCURRENCY = 8
+REQUESTS_PER_SECOND = 2
+RATE_LIMIT_BURST = 4
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+def make_client():
     """
-    Fetch Pokemon data from Bulbapedia.
+    Create the HTTP client shared by all fetches.
+    
+    Returns:
+        httpx.AsyncClient using HTTP/2, with connection retries
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+        retries=3,
+    )
+    return httpx.AsyncClient(transport=transport, headers=HEADERS, timeout=10)
+
+
+class TokenBucket:
+    """
+    Token bucket that lets short bursts of requests through, then refills at
+    a steady rate.
+    
+    Args:
+        rate: Tokens added per second
+        capacity: Maximum number of tokens (burst size)
+    """
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    def pause(self, seconds):
+        """Empty the bucket and hold off refilling it for the given time."""
+        self.tokens = 0
+        self.updated = max(self.updated, time.monotonic() + seconds)
+
+
+# One bucket per host, created on first use
+RATE_LIMITERS = defaultdict(lambda: TokenBucket(REQUESTS_PER_SECOND, RATE_LIMIT_BURST))
+
+
+async def rate_limited_get(client, url, **kwargs):
+    """
+    GET a URL, respecting the per-host rate limit.
+    
+    If the server answers 429 Too Many Requests, the host's bucket is paused
+    for its Retry-After delay and the request is retried.
+    
+    Args:
+        client: httpx.AsyncClient to send the request with
+        url: URL to fetch
+        **kwargs: Passed on to client.get
+        
+    Returns:
+        httpx.Response
+    """
+    bucket = RATE_LIMITERS[httpx.URL(url).host]
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        await bucket.acquire()
+        response = await client.get(url, **kwargs)
+        if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+            return response
+        try:
+            delay = int(response.headers.get('Retry-After', 1))
+        except ValueError:
+            delay = 1
+        bucket.pause(delay)
+
+
+# On-disk cache of parsed results, keyed by lowercase Pokemon name, so reruns
+# don't download and parse every page again. Entries expire after CACHE_TTL
+# seconds
+CACHE_FILE = '.pokedex_cache'
+CACHE_TTL = 30 * 24 * 60 * 60
+
+# Bulbapedia article URL for a Pokemon, given its (URL-encoded) page name
+_URL_TEMPLATE = "https://bulbapedia.bulbagarden.net/wiki/{}_(Pok%C3%A9mon)"
+
+# Pokemon whose names contain spaces, punctuation or symbols, keyed by the
+# lowercase name as it usually appears in input files (letters only).
+# Values are (URL page name, display name)
+_NAME_MAP = {
+    'nidoranf': ('Nidoran%E2%99%80', 'Nidoran♀'),
+    'nidoranm': ('Nidoran%E2%99%82', 'Nidoran♂'),
+    'farfetchd': ('Farfetch%27d', "Farfetch'd"),
+    'mrmime': ('Mr._Mime', 'Mr. Mime'),
+    'hooh': ('Ho-Oh', 'Ho-Oh'),
+    'mimejr': ('Mime_Jr.', 'Mime Jr.'),
+    'porygonz': ('Porygon-Z', 'Porygon-Z'),
+    'flabebe': ('Flab%C3%A9b%C3%A9', 'Flabébé'),
+    'typenull': ('Type:_Null', 'Type: Null'),
+    'jangmoo': ('Jangmo-o', 'Jangmo-o'),
+    'hakamoo': ('Hakamo-o', 'Hakamo-o'),
+    'kommoo': ('Kommo-o', 'Kommo-o'),
+    'tapukoko': ('Tapu_Koko', 'Tapu Koko'),
+    'tapulele': ('Tapu_Lele', 'Tapu Lele'),
+    'tapubulu': ('Tapu_Bulu', 'Tapu Bulu'),
+    'tapufini': ('Tapu_Fini', 'Tapu Fini'),
+    'sirfetchd': ('Sirfetch%27d', "Sirfetch'd"),
+    'mrrime': ('Mr._Rime', 'Mr. Rime'),
+    'greattusk': ('Great_Tusk', 'Great Tusk'),
+    'screamtail': ('Scream_Tail', 'Scream Tail'),
+    'brutebonnet': ('Brute_Bonnet', 'Brute Bonnet'),
+    'fluttermane': ('Flutter_Mane', 'Flutter Mane'),
+    'slitherwing': ('Slither_Wing', 'Slither Wing'),
+    'sandyshocks': ('Sandy_Shocks', 'Sandy Shocks'),
+    'irontreads': ('Iron_Treads', 'Iron Treads'),
+    'ironbundle': ('Iron_Bundle', 'Iron Bundle'),
+    'ironhands': ('Iron_Hands', 'Iron Hands'),
+    'ironjugulis': ('Iron_Jugulis', 'Iron Jugulis'),
+    'ironmoth': ('Iron_Moth', 'Iron Moth'),
+    'ironthorns': ('Iron_Thorns', 'Iron Thorns'),
+    'wochien': ('Wo-Chien', 'Wo-Chien'),
+    'chienpao': ('Chien-Pao', 'Chien-Pao'),
+    'tinglu': ('Ting-Lu', 'Ting-Lu'),
+    'chiyu': ('Chi-Yu', 'Chi-Yu'),
+    'roaringmoon': ('Roaring_Moon', 'Roaring Moon'),
+    'ironvaliant': ('Iron_Valiant', 'Iron Valiant'),
+    'walkingwake': ('Walking_Wake', 'Walking Wake'),
+    'ironleaves': ('Iron_Leaves', 'Iron Leaves'),
+    'gougingfire': ('Gouging_Fire', 'Gouging Fire'),
+    'ragingbolt': ('Raging_Bolt', 'Raging Bolt'),
+    'ironboulder': ('Iron_Boulder', 'Iron Boulder'),
+    'ironcrown': ('Iron_Crown', 'Iron Crown'),
+}
+
+# MediaWiki API endpoint, and the Pokemon Infobox template parameters
+# holding the Pokedex number, category and Japanese name
+_API_URL = "https://bulbapedia.bulbagarden.net/w/api.php"
+_INFOBOX_PARAM_RE = re.compile(r'\|\s*(ndex|category|jname)\s*=([^|}\n]*)')
+_WIKI_MARKUP = ('{{', '[[', '<')
+
+# Regexes matching the standard infobox markup in the raw page bytes: the
+# category span inside the "Pokémon category" link, and the <small> whose
+# first span (inside the National Pokédex link) is the number and whose second
+# span is the Japanese name. The last two find the first National Pokédex link
+# and the first span.explain, which must be the ones matched above for the
+# result to agree with parse_article
+_CATEGORY_RE = re.compile(rb'title="Pok\xc3\xa9mon category"><span (class="explain")[^>]*>([^<]+)</span>')
+_NATIONAL_SMALL_RE = re.compile(
+    rb'<small[^>]*>(?:[^<]|<(?!span[\s>]|/small>))*'
+    rb'(<a\s[^>]*href="[^"]*by_National_Pok[^"]*"[^>]*>)<span[^>]*>(#\d{4})</span>'
+    rb'(?:[^<]|<(?!span[\s>]|/small>))*<span[^>]*>([^<]*)</span>'
+)
+_NATIONAL_LINK_RE = re.compile(rb'<a\s[^>]*href="[^"]*by_National_Pok')
+_EXPLAIN_CLASS_RE = re.compile(rb'class="(?:[^"]*\s)?explain[\s"]')
+
+# XPath queries, compiled once at import: the infobox (the first table with
+# class "roundy") and, relative to it, the category spans in the row naming
+# the Pokemon, the fallback spans mentioning "Pokémon" in that row, and the
+# spans of the <small> tags around the National Pokédex number
+_NAME_ROW = './/tr[contains(., "Pokémon") and contains(translate(., " ", ""), $needle)]'
+_INFOBOX_XPATH = etree.XPath('(//table[contains(concat(" ", normalize-space(@class), " "), " roundy ")])[1]')
+_EXPLAIN_SPANS_XPATH = etree.XPath(_NAME_ROW + '//span[contains(concat(" ", normalize-space(@class), " "), " explain ")]')
+_POKEMON_SPANS_XPATH = etree.XPath(_NAME_ROW + '//span[contains(., "Pokémon")]')
+_NATIONAL_SPANS_XPATH = etree.XPath('.//small[contains(., "National") or contains(., "List of Pokémon")]//span')
+
+# Japanese characters: CJK symbols, Hiragana, Katakana, Kanji and
+# half/full-width forms
+_JA_RE = re.compile(r'[\u3000-\u9fff\uff00-\uffef]')
+
+
+@lru_cache(maxsize=None)
+def resolve_page(pokemon_name):
+    """
+    Resolve a Pokemon name from the input file to its Bulbapedia article.
     
     Args:
         pokemon_name: Name of the Pokemon
         
     Returns:
-        dict with 'name', 'url', 'title', 'japanese', 'pokedex_number'
+        tuple of (url_name, display_name, url)
     """
     # Handle special cases for Pokemon names with special characters
-    # Mr. Mime needs to be Mr._Mime in the URL
-    url_name = pokemon_name
-    display_name = pokemon_name
-    
-    if pokemon_name.lower() == 'mrmime':
-        url_name = 'Mr._Mime'
-        display_name = 'Mr. Mime'
+    # e.g. Mr. Mime needs to be Mr._Mime in the URL
+    url_name, display_name = _NAME_MAP.get(pokemon_name.lower(), (pokemon_name, pokemon_name))
+    return url_name, display_name, _URL_TEMPLATE.format(url_name)
+
+
+async def fetch_infobox_fields(client, url_name):
+    """
+    Fetch the category, Pokedex number and Japanese name from the parameters
+    of the Pokemon Infobox template in the article's wikitext.
     
-    # Construct URL
-    url = f"https://bulbapedia.bulbagarden.net/wiki/{url_name}_(Pok%C3%A9mon)"
+    Args:
+        client: httpx.AsyncClient to call the API with
+        url_name: URL page name of the Pokemon
+        
+    Returns:
+        tuple of (title, pokedex_number, japanese_name), or None if the API
+        request fails or the template is missing any of them
+    """
+    response = await rate_limited_get(client, _API_URL, params={
+        'action': 'parse',
+        'page': f"{unquote(url_name)}_(Pokémon)",
+        'prop': 'wikitext',
+        'redirects': 1,
+        'format': 'json',
+        'formatversion': 2,
+    })
+    # An API error (outage, block, ...) shouldn't stop us scraping the article
+    if not response.is_success:
+        return None
     
+    # A non-JSON body (e.g. a maintenance page) means the API is unusable for
+    # this page; let the caller fall back to scraping the article
     try:
-        # Fetch the page
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Get the Pokemon's category/title from the infobox
-        # Look for the infobox table which contains the category
-        title = ''
-        infobox = soup.find('table', class_='roundy')
-        if infobox:
-            # The category is typically in the first row in a span.explain
-            # Look for the first row with Pokemon data
-            for row in infobox.find_all('tr'):
-                row_text = row.get_text(strip=True)
-                # Look for row containing pokemon name (use display_name which has correct format) and "Pokémon"
-                if display_name.replace(' ', '') in row_text.replace(' ', '') and 'Pokémon' in row_text:
-                    # Find all span.explain elements - we need to pick the English category, not Japanese
-                    explain_spans = row.find_all('span', class_='explain')
-                    for explain_span in explain_spans:
-                        span_text = explain_span.get_text(strip=True)
-                        # Check if this span contains Latin characters (not Japanese)
-                        # Japanese characters are in Unicode ranges: Hiragana, Katakana, Kanji
-                        is_japanese = any(ord(char) > 0x3000 for char in span_text)
-                        if not is_japanese and span_text:
-                            # This is the English category
-                            title = span_text
-                            break
-                    
-                    # If no English span.explain found, try fallback
-                    if not title:
-                        # Find any span with "Pokémon" in it
-                        for span in row.find_all('span'):
-                            span_text = span.get_text(strip=True)
-                            # Check if this is the category
-                            if 'Pokémon' in span_text and span_text != display_name and len(span_text) < 50:
-                                # Extract just the category name
-                                title = span_text.replace(' Pokémon', '').replace('Pokémon', '')
-                                break
-                    if title:
-                        break
-        
-        # Find the Pokedex number
-        # Look for text containing "List of Pokémon by National Pokédex number"
-        pokedex_number = None
-        japanese_name = None
-        
-        # Find the table with National Pokedex info
-        # The number is typically in a link or span near this text
-        for link in soup.find_all('a'):
-            if 'List_of_Pokémon_by_National_Pokédex_number' in link.get('href', ''):
-                # Look for the number in nearby elements
-                parent = link.find_parent('small')
-                if parent:
-                    # Find the span with the number
-                    number_span = parent.find('span')
-                    if number_span:
-                        pokedex_number = number_span.get_text(strip=True)
-                        # Also look for Japanese name in the same area
-                        japanese_span = parent.find_all('span')
-                        if len(japanese_span) > 1:
-                            japanese_name = japanese_span[1].get_text(strip=True)
+        wikitext = orjson.loads(response.content).get('parse', {}).get('wikitext', '')
+    except orjson.JSONDecodeError:
+        return None
+    
+    # Keep the first value of each parameter - the main infobox comes first
+    params = {}
+    for name, value in _INFOBOX_PARAM_RE.findall(wikitext):
+        value = value.strip()
+        if value:
+            params.setdefault(name, value)
+    
+    if len(params) < 3:
+        return None
+    
+    # Values written with wiki markup are cut short at their first "|", so
+    # leave those pages to the HTML fallback
+    if any(marker in value for value in params.values() for marker in _WIKI_MARKUP):
+        return None
+    
+    return params['category'], f"#{params['ndex']}", params['jname']
+
+
+def element_text(element):
+    """
+    Get the stripped text of an HTML element.
+    
+    Leaf elements (most spans) return their own text directly instead of
+    walking the subtree like text_content() does.
+    
+    Args:
+        element: lxml element
+        
+    Returns:
+        Text with surrounding whitespace removed
+    """
+    if len(element):
+        return element.text_content().strip()
+    return (element.text or '').strip()
+
+
+def match_article_fields(content):
+    """
+    Extract the category, Pokedex number and Japanese name from a rendered
+    Bulbapedia article with regexes, without parsing it.
+    
+    Args:
+        content: Raw bytes of the article
+        
+    Returns:
+        tuple of (title, pokedex_number, japanese_name), or None if the page
+        doesn't follow the standard infobox markup
+    """
+    category = _CATEGORY_RE.search(content)
+    national = _NATIONAL_SMALL_RE.search(content)
+    if not category or not national:
+        return None
+    
+    # parse_article uses the first span.explain and the first National
+    # Pokédex link on the page; make sure those are the ones matched
+    if _EXPLAIN_CLASS_RE.search(content).start() != category.start(1):
+        return None
+    if _NATIONAL_LINK_RE.search(content).start() != national.start(1):
+        return None
+    
+    fields = [m.decode('utf-8', 'replace').strip()
+              for m in (category.group(2), national.group(2), national.group(3))]
+    if not all(fields):
+        return None
+    
+    title, pokedex_number, japanese_name = fields
+    if _JA_RE.search(title):
+        return None
+    
+    return title, pokedex_number, japanese_name
+
+
+def parse_article(page_html, display_name):
+    """
+    Extract the category, Pokedex number and Japanese name from a rendered
+    Bulbapedia article.
+    
+    Args:
+        page_html: HTML of the article
+        display_name: Display name of the Pokemon
+        
+    Returns:
+        tuple of (title, pokedex_number, japanese_name)
+    """
+    # Parse HTML directly with lxml and pull the fields out with the
+    # precompiled XPath queries
+    tree = html.fromstring(page_html)
+    
+    # Look up the infobox once; the category and the fallback Pokedex number
+    # lookups below only search inside it
+    infobox = next(iter(_INFOBOX_XPATH(tree)), None)
+    
+    # Get the Pokemon's category/title from the infobox
+    # The category is a span.explain in the first infobox row that contains
+    # the Pokemon's name (display_name has the correct format) and "Pokémon".
+    # There may be several span.explain - we need the English category, not Japanese
+    # Rows are checked for "Pokémon" first, which rejects most of them before
+    # the space-stripped name comparison
+    needle = display_name.replace(' ', '')
+    title = ''
+    if infobox is not None:
+        for explain_span in _EXPLAIN_SPANS_XPATH(infobox, needle=needle):
+            span_text = element_text(explain_span)
+            # Check if this span contains Latin characters (not Japanese)
+            # Japanese characters are in Unicode ranges: Hiragana, Katakana, Kanji
+            is_japanese = bool(_JA_RE.search(span_text))
+            if not is_japanese and span_text:
+                # This is the English category
+                title = span_text
                 break
         
-        # Alternative method: look in the infobox
-        if not pokedex_number:
-            # Look for the number in roundy elements or specific spans
-            infobox = soup.find('table', class_='roundy')
-            if infobox:
-                # Find all small tags that might contain the number
-                for small in infobox.find_all('small'):
-                    text = small.get_text()
-                    if 'National' in text or 'List of Pokémon' in text:
-                        spans = small.find_all('span')
-                        if spans:
-                            for span in spans:
-                                span_text = span.get_text(strip=True)
-                                if span_text.startswith('#') or span_text.isdigit():
-                                    pokedex_number = span_text
-                                elif not japanese_name and not span_text.startswith('#'):
-                                    # Might be Japanese name
-                                    japanese_name = span_text
-        
-        # If still not found, try another approach
-        if not pokedex_number:
-            # Look for pattern like "#0127" in the page
-            for span in soup.find_all('span'):
-                text = span.get_text(strip=True)
-                if text.startswith('#0') and len(text) == 5:
-                    pokedex_number = text
+        # If no English span.explain found, try any span with "Pokémon" in it
+        if not title:
+            for span in _POKEMON_SPANS_XPATH(infobox, needle=needle):
+                span_text = element_text(span)
+                if span_text != display_name and len(span_text) < 50:
+                    # Extract just the category name
+                    title = span_text.replace(' Pokémon', '').replace('Pokémon', '')
                     break
+    
+    # Find the Pokedex number and Japanese name
+    # Walk the page once for everything that isn't scoped to the infobox:
+    # the <small> holding the link to "List of Pokémon by National Pokédex
+    # number" (its first span is the number, the second the Japanese name),
+    # the first span like "#0127" and the first lang-ja span.
+    # Stop once the National link has been seen and both fields are settled
+    pokedex_number = None
+    japanese_name = None
+    number_span_text = None
+    ja_span_text = None
+    national_link_seen = False
+    
+    for el in tree.iter('a', 'span'):
+        if el.tag == 'a':
+            if not national_link_seen and 'by_National_Pok' in el.get('href', ''):
+                national_link_seen = True
+                small = next(el.iterancestors('small'), None)
+                if small is not None:
+                    spans = list(small.iter('span'))
+                    if spans:
+                        pokedex_number = element_text(spans[0])
+                        if len(spans) > 1:
+                            japanese_name = element_text(spans[1])
+        else:
+            if ja_span_text is None and el.get('lang') == 'ja':
+                ja_span_text = element_text(el)
+            if number_span_text is None:
+                text = element_text(el)
+                if text.startswith('#0') and len(text) == 5:
+                    number_span_text = text
+    
+        # The National Pokédex link is the primary source, so keep walking until
+        # it has been seen - earlier "#0126"-style spans may be the neighbouring
+        # Pokemon in the page header
+        if national_link_seen and (pokedex_number or number_span_text) and (japanese_name or ja_span_text is not None):
+            break
+    
+    # Alternative method: look in the infobox's <small> tags
+    if not pokedex_number and infobox is not None:
+        for span in _NATIONAL_SPANS_XPATH(infobox):
+            span_text = element_text(span)
+            if span_text.startswith('#') or span_text.isdigit():
+                pokedex_number = span_text
+            elif not japanese_name:
+                # Might be Japanese name
+                japanese_name = span_text
+    
+    # If still not found, use the first span like "#0127" in the page
+    if not pokedex_number:
+        pokedex_number = number_span_text
+    
+    # Get Japanese name from the lang-ja spans
+    if not japanese_name:
+        japanese_name = ja_span_text
+    
+    return title, pokedex_number, japanese_name
+
+
+async def fetch_pokemon_data(client, pokemon_name, cache=None):
+    """
+    Fetch Pokemon data from Bulbapedia.
+    
+    Args:
+        client: httpx.AsyncClient to fetch the data with
+        pokemon_name: Name of the Pokemon
+        cache: Optional shelve-like mapping of previously fetched results
         
-        # Get Japanese name from the page title or lang-ja spans
-        if not japanese_name:
-            ja_spans = soup.find_all('span', lang='ja')
-            if ja_spans:
-                japanese_name = ja_spans[0].get_text(strip=True)
+    Returns:
+        dict with 'name', 'url', 'title', 'japanese', 'pokedex_number'
+    """
+    # Return a fresh cached result without touching the network
+    cache_key = pokemon_name.lower()
+    if cache is not None:
+        entry = cache.get(cache_key)
+        if entry and time.time() - entry['fetched_at'] < CACHE_TTL:
+            return entry['data']
+    
+    url_name, display_name, url = resolve_page(pokemon_name)
+    
+    try:
+        # Ask the MediaWiki API for the article's wikitext first: the infobox
+        # template parameters hold every field we need, in a fraction of the
+        # bytes of the rendered page and without any HTML parsing
+        fields = await fetch_infobox_fields(client, url_name)
+        
+        if not fields:
+            # Fall back to scraping the rendered article
+            response = await rate_limited_get(client, url)
+            response.raise_for_status()
+            # Pages with the standard infobox markup are handled by a few
+            # regexes; only parse the HTML when one of them misses
+            # (response.text is decoded using the charset from the HTTP headers)
+            fields = match_article_fields(response.content) or parse_article(response.text, display_name)
         
-        return {
+        title, pokedex_number, japanese_name = fields
+        
+        data = {
             'name': display_name,
             'url': url,
             'title': title,
@@ -140,8 +482,18 @@ def fetch_pokemon_data(pokemon_name):
             'pokedex_number': pokedex_number or ''
         }
         
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data for {pokemon_name}: {e}", file=sys.stderr)
+        # Only cache complete results so a bad scrape is retried on the next run
+        if cache is not None and title and pokedex_number:
+            cache[cache_key] = {'data': data, 'fetched_at': time.time()}
+        
+        return data
+        
+    except httpx.HTTPError as e:
+        logger.error("Error fetching data for %s: %s", pokemon_name, e)
+        return None
+    except (etree.ParserError, ValueError) as e:
+        # e.g. an empty page body ("Document is empty")
+        logger.error("Error parsing data for %s: %s", pokemon_name, e)
         return None
 
 
@@ -168,7 +520,7 @@ def format_output(data):
     return output
 
 
-def process_input_file(input_file, output_file):
+async def process_input_file(input_file, output_file):
     """
     Process the input file and write results to output file.
     
@@ -177,43 +529,55 @@ def process_input_file(input_file, output_file):
         output_file: Path to output file
     """
     try:
+        # Read the whole file at once; split on newlines rather than any
+        # whitespace so names like "Mr. Mime" stay in one piece
         with open(input_file, 'r') as f:
-            pokemon_names = [line.strip() for line in f if line.strip()]
-        
-        results = []
-        
-        for i, pokemon_name in enumerate(pokemon_names, 1):
-            print(f"Processing {i}/{len(pokemon_names)}: {pokemon_name}...")
-            
-            data = fetch_pokemon_data(pokemon_name)
-            if data:
-                formatted = format_output(data)
-                if formatted:
-                    results.append(formatted)
-                    print(f"  ✓ Success: {data['title']}")
-                else:
-                    print(f"  ✗ Failed to format data")
-            else:
-                print(f"  ✗ Failed to fetch data")
-            
-            # Be polite to the server - add a small delay between requests
-            if i < len(pokemon_names):
-                time.sleep(1)
-        
-        # Write results to output file
-        with open(output_file, 'w') as f:
-            for result in results:
-                f.write(result)
-                f.write('\n')
-        
-        print(f"\n✓ Successfully processed {len(results)}/{len(pokemon_names)} Pokemon")
-        print(f"✓ Results written to: {output_file}")
+            pokemon_names = [name for name in map(str.strip, f.read().splitlines()) if name]
+        
+        succeeded = 0
+        
+        # Fetch pages concurrently; the semaphore caps requests in flight and
+        # the per-host rate limiters keep us polite to the server
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        
+        async def fetch(pokemon_name):
+            async with semaphore:
+                return await fetch_pokemon_data(client, pokemon_name, cache)
+        
+        # Write each result as soon as it is ready (in input order) so progress
+        # survives a crash and results aren't held in memory
+        with shelve.open(CACHE_FILE) as cache, open(output_file, 'w', buffering=1) as f:
+            async with make_client() as client:
+                # Duplicate names (in any case) share a single fetch
+                tasks = {}
+                for name in pokemon_names:
+                    if name.lower() not in tasks:
+                        tasks[name.lower()] = asyncio.create_task(fetch(name))
+                
+                for i, pokemon_name in enumerate(pokemon_names, 1):
+                    data = await tasks[pokemon_name.lower()]
+                    # One log line per Pokemon keeps console writes down on long runs
+                    progress = f"Processed {i}/{len(pokemon_names)}: {pokemon_name}"
+                    
+                    if data:
+                        formatted = format_output(data)
+                        if formatted:
+                            f.write(formatted + '\n')
+                            succeeded += 1
+                            logger.info("%s  ✓ Success: %s", progress, data['title'])
+                        else:
+                            logger.warning("%s  ✗ Failed to format data", progress)
+                    else:
+                        logger.warning("%s  ✗ Failed to fetch data", progress)
+        
+        logger.info("✓ Successfully processed %d/%d Pokemon", succeeded, len(pokemon_names))
+        logger.info("✓ Results written to: %s", output_file)
         
     except FileNotFoundError:
-        print(f"Error: Input file '{input_file}' not found", file=sys.stderr)
+        logger.error("Error: Input file '%s' not found", input_file)
         sys.exit(1)
     except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
+        logger.error("Error: %s", e)
         sys.exit(1)
 
 
@@ -233,7 +597,11 @@ def main():
     print(f"Output file: {output_file}")
     print("-" * 50)
     
-    process_input_file(input_file, output_file)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # httpx logs every request at INFO; only show its warnings
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    
+    asyncio.run(process_input_file(input_file, output_file))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,36 @@
+import unittest
+
+from pokedex_scraper import match_article_fields, parse_article
+
+
+# Trimmed-down Bulbapedia article with the standard infobox markup, plus a
+# page header showing the neighbouring Pokemon and a lang-ja span before it
+STANDARD_ARTICLE = '''<!DOCTYPE html>
+<html><head><meta charset="UTF-8"><title>Pinsir (Pokémon)</title></head><body>
+<table class="nav"><tr><td><span>#0126</span> Magmar <span lang="ja">Header</span></td></tr></table>
+<table class="roundy" style="background:#fff"><tr><td colspan="2">
+<table class="roundy"><tr>
+<td><big><big><b>Pinsir</b></big></big><br><a href="/wiki/Pok%C3%A9mon_category" title="Pokémon category"><span class="explain" title="Stag Beetle Pokémon">Stag Beetle Pokémon</span></a></td>
+<td><b><span lang="ja">カイロス</span></b><br><i>Kairos</i></td>
+</tr><tr><th><small><a href="/wiki/List_of_Pok%C3%A9mon_by_National_Pok%C3%A9dex_number" title="List of Pokémon by National Pokédex number"><span style="color:#000;">#0127</span></a> <span>カイロスS</span></small></th></tr></table>
+</td></tr></table>
+</body></html>
+'''
+
+
+class ArticleFieldsTest(unittest.TestCase):
+
+    def test_fast_path_matches_parser(self):
+        content = STANDARD_ARTICLE.encode('utf-8')
+        fields = match_article_fields(content)
+        self.assertIsNotNone(fields)
+        self.assertEqual(fields, parse_article(STANDARD_ARTICLE, 'Pinsir'))
+        self.assertEqual(fields, ('Stag Beetle Pokémon', '#0127', 'カイロスS'))
+
+    def test_fast_path_defers_to_parser_without_national_small(self):
+        page = STANDARD_ARTICLE.replace('<small>', '').replace('</small>', '')
+        self.assertIsNone(match_article_fields(page.encode('utf-8')))
+
+
+if __name__ == '__main__':
+    unittest.main()